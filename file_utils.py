@@ -1,12 +1,18 @@
 import os
+import re
 import random
 import string
-import threading
 import multiprocessing
+import multiprocessing.pool
+import functools
 import time
 import shutil
-from typing import List, Dict
+import warnings
+from typing import List, Dict, Iterator, Sequence, Tuple
 from enum import Enum
+from collections import defaultdict
+import numpy as np
+import ahocorasick
 
 
 class Methods(Enum):
@@ -14,6 +20,68 @@ class Methods(Enum):
     MULTIPROCESSING = "multiprocessing"
 
 
+# Main words of the generated texts
+WORDS = [
+    "python",
+    "data",
+    "algorithm",
+    "machine",
+    "learning",
+    "artificial",
+    "intelligence",
+    "programming",
+    "code",
+    "software",
+    "computer",
+    "science",
+    "developer",
+    "technology",
+    "system",
+]
+
+# Keywords that are additionally appended to the generated texts
+KEYWORDS = np.array(["python", "data", "algorithm"], dtype=object)
+
+# Vocabulary: main words plus additional random words for variety
+VOCAB = np.array(
+    WORDS
+    + [
+        "".join(random.choices(string.ascii_lowercase, k=random.randint(3, 8)))
+        for _ in range(50)
+    ],
+    dtype=object,
+)
+
+_rng = np.random.default_rng()
+
+# Default kernel readahead window, larger files get a sequential access hint
+READAHEAD_WINDOW = 128 * 1024
+
+# Line boundaries other than "\n" that text-mode reading and str.splitlines()
+# recognize, they are rewritten to "\n" before a file is scanned
+LINE_BREAK_BYTES = (b"\r", b"\x0b", b"\x0c", b"\x1c", b"\x1d", b"\x1e")
+LINE_BREAK_CHARS = ("\r", "\x0b", "\x0c", "\x1c", "\x1d", "\x1e", "\x85", "\u2028", "\u2029")
+_line_breaks_bytes_re = re.compile(rb"\r\n?|[\x0b\x0c\x1c-\x1e]")
+_line_breaks_re = re.compile("\r\n?|[\x0b\x0c\x1c-\x1e\x85\u2028\u2029]")
+
+# CPUs this process may run on, looked up once at import. The affinity mask
+# honors cpusets and container CPU limits, unlike os.cpu_count()
+if hasattr(os, "sched_getaffinity"):
+    DEFAULT_WORKERS = len(os.sched_getaffinity(0))
+else:
+    DEFAULT_WORKERS = os.cpu_count() or 1
+
+
+def _init_rng() -> None:
+    """
+    Reseed the module-level random generator.
+    Called once in every worker process so forked children do not share
+    the parent's random stream.
+    """
+    global _rng
+    _rng = np.random.default_rng()
+
+
 def generate_random_text(min_words: int = 50, max_words: int = 500) -> str:
     """
     Generate random text.
@@ -23,100 +91,105 @@ def generate_random_text(min_words: int = 50, max_words: int = 500) -> str:
     return:
         Generated text
     """
-    words = [
-        "python",
-        "data",
-        "algorithm",
-        "machine",
-        "learning",
-        "artificial",
-        "intelligence",
-        "programming",
-        "code",
-        "software",
-        "computer",
-        "science",
-        "developer",
-        "technology",
-        "system",
-    ]
+    # Pick all words with a single vectorized draw from the vocabulary
+    num_words = _rng.integers(min_words, max_words, endpoint=True)
+    text_words = VOCAB[_rng.integers(0, len(VOCAB), size=num_words)]
 
-    # Additional words for variety
-    random_words = [
-        "".join(random.choices(string.ascii_lowercase, k=random.randint(3, 8)))
-        for _ in range(50)
-    ]
+    # Add keywords with a certain probability (70% chance for each keyword)
+    added_keywords = KEYWORDS[_rng.random(len(KEYWORDS)) < 0.7]
 
-    # Combine main and random words
-    total_words = words + random_words
+    return " ".join(np.concatenate((text_words, added_keywords)).tolist())
+
+
+def create_file(base_dir: str, file_info: Dict[str, str]) -> str:
+    """
+    Create a single file with random text in an existing subdirectory.
+    params:
+        base_dir: Base directory
+        file_info: Subdirectory and filename of the file to create
+    return:
+        Created file path
+    """
+    # Full file path, its directory is created up front by the caller
+    file_path = os.path.join(base_dir, file_info["subdir"], file_info["filename"])
 
     # Generate text
-    num_words = random.randint(min_words, max_words)
-    text_words = [random.choice(total_words) for _ in range(num_words)]
+    data = generate_random_text().encode("utf-8")
 
-    # Add keywords with a certain probability
-    for keyword in ["python", "data", "algorithm"]:
-        if random.random() < 0.7:  # 70% chance to add a keyword
-            text_words.append(keyword)
+    # Write the few kilobytes of text with a single unbuffered write,
+    # a memoryview only covers a short write without copying the rest
+    fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
 
-    return " ".join(text_words)
+    return file_path
 
 
 def create_file_thread_worker(
     base_dir: str,
     files_to_create: List[Dict[str, str]],
-    result_queue: multiprocessing.Queue = None,
-    lock: threading.Lock = None,
     logger=None,
-) -> List[str]:
+) -> int:
     """
     Thread worker for creating files.
     params:
         base_dir: Base directory
         files_to_create: List of files to create
-        result_queue: Queue for passing results (optional)
-        lock: Lock for synchronization (optional)
         logger: Logger for logging messages (optional)
     return:
-        List of created file paths
+        Number of created files
     """
     if logger:
         logger.info(f"Thread worker started for base_dir: {base_dir}")
 
-    created_files = []
-    buffer_size = 1024 * 1024  # 1MB buffer size
-
     for file_info in files_to_create:
-        # Full file path
-        file_path = os.path.join(base_dir, file_info["subdir"], file_info["filename"])
+        create_file(base_dir, file_info)
 
-        # Create directory if it doesn't exist
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    if logger:
+        logger.info(
+            f"Thread worker finished for base_dir: {base_dir}, created {len(files_to_create)} files"
+        )
 
-        # Generate text
-        text = generate_random_text()
+    return len(files_to_create)
 
-        # Create file with buffering
-        with open(file_path, "w", encoding="utf-8") as f:
-            start = 0
-            while start < len(text):
-                f.write(text[start:start + buffer_size])
-                start += buffer_size
 
-        created_files.append(file_path)
-        if logger:
-            logger.info(f"Created file: {file_path}")
+def pin_process_to_core() -> None:
+    """
+    Pin the current pool worker process to a single CPU core.
+    Workers are spread over the allowed cores by their pool index, so the
+    scheduler doesn't migrate them and their caches stay warm.
+    Does nothing on platforms without sched_setaffinity or outside a pool.
+    """
+    if not hasattr(os, "sched_setaffinity"):
+        return
+    identity = multiprocessing.current_process()._identity
+    if not identity:
+        return
+    cores = sorted(os.sched_getaffinity(0))
+    os.sched_setaffinity(0, {cores[(identity[0] - 1) % len(cores)]})
 
-    # If a result queue is passed, add the result
-    if result_queue is not None:
-        result_queue.put(created_files)
-        if logger:
-            logger.info(f"Added created files to result queue")
 
-    if logger:
-        logger.info(f"Thread worker finished for base_dir: {base_dir}")
+def _create_file_task(base_dir: str, file_info: Dict[str, str]) -> None:
+    """
+    Pool task for creating a single file, the path is not sent back.
+    params:
+        base_dir: Base directory
+        file_info: Subdirectory and filename of the file to create
+    """
+    create_file(base_dir, file_info)
+
 
-    return created_files
+def init_pool_worker() -> None:
+    """
+    Initialize a pool worker process shared by file creation and search:
+    reseed the random generator and pin the process to a core.
+    """
+    _init_rng()
+    pin_process_to_core()
 
 
 def create_test_files_and_folders(
@@ -124,14 +197,16 @@ def create_test_files_and_folders(
     num_files: int = 50,
     parallel_method: str = Methods.MULTIPROCESSING.value,
     logger=None,
+    pool: multiprocessing.pool.Pool = None,
 ) -> List[str]:
     """
     Create test files and folders using parallel methods.
     params:
         base_dir: Base directory for creating files
         num_files: Number of files to generate
-        parallel_method: Parallel processing method ('threading' or 'multiprocessing')
+        parallel_method: Parallel processing method ('multiprocessing', 'threading' is deprecated)
         logger: Logger for logging messages (optional)
+        pool: Process pool initialized with init_pool_worker to reuse (optional)
     return:
         List of created file paths
     """
@@ -150,149 +225,341 @@ def create_test_files_and_folders(
     subdirs = ["subdir1", "subdir2", "subdir3"]
     nested_subdirs = ["nested1", "nested2"]
 
-    # Prepare list of files to create
-    files_to_create = []
-    for i in range(num_files):
-        # Randomly choose a subdirectory
-        subdir_choices = [
-            "",
-            *subdirs,
-            *[f"{subdir}/{nested}" for subdir in subdirs for nested in nested_subdirs],
-        ]
+    subdir_choices = [
+        "",
+        *subdirs,
+        *(f"{subdir}/{nested}" for subdir in subdirs for nested in nested_subdirs),
+    ]
 
-        random_subdir = random.choice(subdir_choices)
-        filename = f"file_{i}.txt"
+    # Create all subdirectories once instead of checking them for every file
+    for subdir in subdir_choices:
+        os.makedirs(os.path.join(base_dir, subdir), exist_ok=True)
 
-        files_to_create.append({"subdir": random_subdir, "filename": filename})
+    # Prepare list of files to create, each in a randomly chosen subdirectory
+    random_subdirs = random.choices(subdir_choices, k=num_files)
+    files_to_create = [
+        {"subdir": random_subdir, "filename": f"file_{i}.txt"}
+        for i, random_subdir in enumerate(random_subdirs)
+    ]
 
     if logger:
         logger.info(f"Prepared list of {num_files} files to create")
 
     # Determine number of threads/processes
-    num_workers = os.cpu_count()
+    num_workers = DEFAULT_WORKERS
     if logger:
         logger.info(f"Using {num_workers} workers for parallel processing")
 
-    # Distribute files among threads/processes
-    files_per_worker = [files_to_create[i::num_workers] for i in range(num_workers)]
-
-    # List to store created files
-    all_created_files = []
+    # Paths of the created files are known from the plan, workers don't send them back.
+    # Directory prefixes with a trailing separator are joined once, so each path
+    # is a plain string concatenation instead of an os.path.join call
+    dir_prefixes = {
+        subdir: os.path.join(base_dir, subdir, "") for subdir in subdir_choices
+    }
+    all_created_files = [
+        dir_prefixes[file_info["subdir"]] + file_info["filename"]
+        for file_info in files_to_create
+    ]
 
-    # Choose parallel processing method
+    # Text generation is CPU-bound Python code and the writes are too small to
+    # release the GIL for long, so threads only contend for it
     if parallel_method == Methods.THREADING.value:
-        # Multithreading method
-        result_lock = threading.Lock()
-        threads = []
-
-        for worker_files in files_per_worker:
-            thread = threading.Thread(
-                target=create_file_thread_worker,
-                args=(base_dir, worker_files),
-                kwargs={"lock": result_lock},
-            )
-            thread.start()
-            threads.append(thread)
-
-        # Wait for threads to finish
-        for thread in threads:
-            thread.join()
-
-        if logger:
-            logger.info("Completed file creation using threading")
-
-    elif parallel_method == Methods.MULTIPROCESSING.value:
-        # Multiprocessing method
-        result_queue = multiprocessing.Queue()
-        processes = []
-
-        for worker_files in files_per_worker:
-            process = multiprocessing.Process(
-                target=create_file_thread_worker,
-                args=(base_dir, worker_files, result_queue),
-            )
-            process.start()
-            processes.append(process)
-
-        # Collect results
-        for _ in processes:
-            all_created_files.extend(result_queue.get())
+        warnings.warn(
+            "The 'threading' method for file creation is deprecated, "
+            "'multiprocessing' is used instead",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        parallel_method = Methods.MULTIPROCESSING.value
 
-        # Wait for processes to finish
-        for process in processes:
-            process.join()
+    # Choose parallel processing method
+    if parallel_method == Methods.MULTIPROCESSING.value:
+        # Multiprocessing method: a process pool hands out chunks of files,
+        # an existing pool is reused instead of starting new processes
+        chunksize = max(1, num_files // (num_workers * 4))
+        create_task = functools.partial(_create_file_task, base_dir)
+        if pool is not None:
+            pool.map(create_task, files_to_create, chunksize=chunksize)
+        else:
+            with multiprocessing.Pool(num_workers, initializer=init_pool_worker) as own_pool:
+                own_pool.map(create_task, files_to_create, chunksize=chunksize)
 
         if logger:
             logger.info("Completed file creation using multiprocessing")
 
     else:
         # Sequential method as a fallback
-        all_created_files = create_file_thread_worker(base_dir, files_to_create)
+        create_file_thread_worker(base_dir, files_to_create)
         if logger:
             logger.info("Completed file creation using sequential method")
 
     return all_created_files
 
-def find_all_files(base_dir: str = "test_search_files", logger=None) -> List[str]:
+
+def _scan_files(directory: str) -> Iterator[str]:
+    """
+    Recursively yield file paths using os.scandir.
+    The entry type comes from the cached directory listing, so no stat call
+    is made per entry. Like os.walk, unreadable directories are skipped and
+    symlinks to directories are not followed.
+    params:
+        directory: Directory to scan
+    return:
+        Iterator over file paths
+    """
+    try:
+        entries = os.scandir(directory)
+    except OSError:
+        return
+    with entries:
+        for entry in entries:
+            if entry.is_dir():
+                if not entry.is_symlink():
+                    yield from _scan_files(entry.path)
+            else:
+                yield entry.path
+
+
+def find_all_files(base_dir: str = "test_search_files", logger=None) -> Tuple[str, ...]:
     """
     Find all files in the given directory.
     params:
         base_dir: Base directory to search for files
         logger: Logger for logging messages (optional)
     return:
-        List of all found file paths
+        Tuple of all found file paths
     """
     if logger:
         logger.info(f"Searching for all files in directory: {base_dir}")
-    all_files = []
-    for root, _, files in os.walk(base_dir):
-        for file in files:
-            all_files.append(os.path.join(root, file))
-    return all_files
+    return tuple(_scan_files(base_dir))
 
 
-def search_keywords_in_file(
-    file_path: str, keywords: List[str], logger=None
-) -> Dict[str, List[str]]:
+def prepare_search_files(file_paths: Sequence[str]) -> List[str]:
     """
-    Search for keywords in a specific file.
+    Prepare the files to search: drop duplicate paths and empty files, and
+    order the rest largest first.
+    A path passed more than once is kept once, so each file is read only once.
+    Empty files are left out, there is nothing to find in them.
+    Largest first lets dynamically scheduled workers start with the longest
+    scans and finish on small files instead of a long tail.
+    Files that can't be stat'ed go last, the search reports them.
+    params:
+        file_paths: List of file paths
+    return:
+        List of unique non-empty file paths ordered by size, largest first
+    """
+    file_paths = list(dict.fromkeys(file_paths))
+    sizes = []
+    for file_path in file_paths:
+        try:
+            sizes.append(os.stat(file_path).st_size)
+        except OSError:
+            sizes.append(-1)
+    order = sorted(range(len(file_paths)), key=sizes.__getitem__, reverse=True)
+    return [file_paths[i] for i in order if sizes[i] != 0]
+
+
+def build_keywords_automaton(keywords: List[str]) -> ahocorasick.Automaton:
+    """
+    Build an Aho-Corasick automaton that finds all keywords in one pass.
+    Words are added lowercased, values are the indices of all keywords
+    with that lowercased form, so keywords differing only in case are all reported.
+    Empty keywords are left out, as on the ASCII path; with no words left
+    the automaton stays empty (kind ahocorasick.EMPTY) and can't be iterated.
+    params:
+        keywords: List of keywords to search for
+    return:
+        Automaton ready for searching lowercased text
+    """
+    keyword_ids = defaultdict(list)
+    for keyword_id, keyword in enumerate(keywords):
+        if keyword:
+            keyword_ids[keyword.lower()].append(keyword_id)
+    automaton = ahocorasick.Automaton()
+    for word, ids in keyword_ids.items():
+        automaton.add_word(word, tuple(ids))
+    automaton.make_automaton()
+    return automaton
+
+
+@functools.lru_cache(maxsize=None)
+def get_keywords_automaton(keywords: Tuple[str, ...]) -> ahocorasick.Automaton:
+    """
+    Build the keywords automaton once per process, even when a pool is reused.
+    params:
+        keywords: Keywords to search for
+    return:
+        Keywords automaton
+    """
+    return build_keywords_automaton(keywords)
+
+
+@functools.lru_cache(maxsize=None)
+def _ascii_needles(keywords: Tuple[str, ...]) -> Tuple[Tuple[int, bytes], ...]:
+    """
+    Lowercase and encode the keywords once, not for every file.
+    Keywords whose lowercased form is not ASCII can't match ASCII text and are
+    left out, empty keywords too. A non-ASCII keyword can still lowercase to
+    ASCII, e.g. the Kelvin sign to "k".
+    params:
+        keywords: Keywords to search for
+    return:
+        Pairs of keyword index and its lowercased ASCII bytes
+    """
+    lowered = (keyword.lower() for keyword in keywords)
+    return tuple(
+        (keyword_id, keyword.encode("ascii"))
+        for keyword_id, keyword in enumerate(lowered)
+        if keyword and keyword.isascii()
+    )
+
+
+def prepare_keywords(keywords: Tuple[str, ...]) -> None:
+    """
+    Build the cached per-process keywords state up front: the encoded needles
+    of the ASCII path and the automaton for other files.
+    params:
+        keywords: Keywords to search for
+    """
+    _ascii_needles(keywords)
+    get_keywords_automaton(keywords)
+
+
+def find_keyword_lines(
+    file_path: str,
+    keywords: List[str],
+    logger=None,
+    automaton: ahocorasick.Automaton = None,
+) -> Dict[int, List[int]]:
+    """
+    Find the lines of a specific file that contain the keywords.
     params:
         file_path: Path to the file
         keywords: List of keywords to search for
         logger: Logger for logging messages (optional)
+        automaton: Automaton built by build_keywords_automaton, used for non-ASCII files (optional)
     return:
-        Dictionary of found keywords and their locations
+        Dictionary of found keyword indices and their line numbers
     """
-    results = {keyword: [] for keyword in keywords}
-    buffer_size = 1024 * 1024  # 1MB buffer size
+    if not keywords:
+        return {}
+
+    results = {}
 
     try:
-        with open(file_path, "r", encoding="utf-8") as file:
-            line_num = 0
+        # Read the whole file straight from the descriptor: one fstat for the
+        # size and a read of that size, without the file object layers
+        fd = os.open(file_path, os.O_RDONLY)
+        try:
+            size = os.fstat(fd).st_size
+            # Ask the kernel for aggressive readahead on files larger than its
+            # default window, small files don't need the extra syscall
+            if size > READAHEAD_WINDOW and hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            chunks = [os.read(fd, size)]
+            # Read on until end of file: huge files come back short from a single
+            # read, and files can hold more than their size says (appended since
+            # the fstat, pseudo-files). Usually this is just one empty read
             while True:
-                buffer = file.read(buffer_size)
-                if not buffer:
+                chunk = os.read(fd, 64 * 1024)
+                if not chunk:
                     break
-                lines = buffer.splitlines(keepends=True)
-                for line in lines:
-                    line_num += 1
-                    for keyword in keywords:
-                        if keyword.lower() in line.lower():
-                            results[keyword].append(f"{file_path}:line {line_num}")
-                            if logger:
-                                logger.info(f"Found keyword '{keyword}' in {file_path} at line {line_num}")
+                chunks.append(chunk)
+            raw = chunks[0] if len(chunks) == 1 else b"".join(chunks)
+        finally:
+            os.close(fd)
     except FileNotFoundError as e:
         if logger:
             logger.error(f"File not found: {file_path}")
         else:
             print(f"File not found: {file_path}")
+        return {}
     except IOError as e:
         if logger:
             logger.error(f"IO error processing file {file_path}: {e}")
         else:
             print(f"IO error processing file {file_path}: {e}")
+        return {}
+
+    if raw.isascii():
+        # Lowercase the bytes once and let bytes.find scan for each keyword in C,
+        # the hits of each keyword form one contiguous run of positions
+        data = raw.lower()
+        # Files with other line breaks are rare, memchr checks keep the rest cheap
+        if any(line_break in data for line_break in LINE_BREAK_BYTES):
+            data = _line_breaks_bytes_re.sub(b"\n", data)
+        positions = []
+        keyword_runs = []
+        for keyword_id, needle in _ascii_needles(tuple(keywords)):
+            start = len(positions)
+            pos = data.find(needle)
+            while pos != -1:
+                positions.append(pos)
+                pos = data.find(needle, pos + 1)
+            if len(positions) > start:
+                keyword_runs.append((keyword_id, start, len(positions)))
+        if positions:
+            # All hit offsets of the file are mapped to line numbers with a single
+            # vectorized search over the newline offsets: a hit is on the line
+            # after the newlines preceding it
+            newlines = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == ord("\n"))
+            line_nums = (np.searchsorted(newlines, positions) + 1).tolist()
+            for keyword_id, start, end in keyword_runs:
+                # Each keyword is reported once per line
+                results[keyword_id] = list(dict.fromkeys(line_nums[start:end]))
+    else:
+        # Non-ASCII text is decoded and lowercased once and scanned in a single
+        # automaton pass, line numbers are counted lazily, only up to each match
+        if automaton is None:
+            automaton = build_keywords_automaton(keywords)
+        # Nothing to find when all keywords are empty
+        if automaton.kind == ahocorasick.EMPTY:
+            return {}
+        text = raw.decode("utf-8", "replace").lower()
+        if any(line_break in text for line_break in LINE_BREAK_CHARS):
+            text = _line_breaks_re.sub("\n", text)
+        automaton_results = defaultdict(list)
+        line_num = 1
+        line_pos = 0
+        for end, keyword_ids in automaton.iter(text):
+            line_num += text.count("\n", line_pos, end)
+            line_pos = end
+            for keyword_id in keyword_ids:
+                keyword_lines = automaton_results[keyword_id]
+                # Each keyword is reported once per line
+                if not keyword_lines or keyword_lines[-1] != line_num:
+                    keyword_lines.append(line_num)
+        # Keywords in input order, like the ASCII path
+        results = {
+            keyword_id: automaton_results[keyword_id]
+            for keyword_id in sorted(automaton_results)
+        }
+
+    return results
 
-    return {k: v for k, v in results.items() if v}
+
+def search_keywords_in_file(
+    file_path: str,
+    keywords: List[str],
+    logger=None,
+    automaton: ahocorasick.Automaton = None,
+) -> Dict[str, List[str]]:
+    """
+    Search for keywords in a specific file.
+    params:
+        file_path: Path to the file
+        keywords: List of keywords to search for
+        logger: Logger for logging messages (optional)
+        automaton: Automaton built by build_keywords_automaton, used for non-ASCII files (optional)
+    return:
+        Dictionary of found keywords and their locations
+    """
+    return {
+        keywords[keyword_id]: [f"{file_path}:line {line_num}" for line_num in line_nums]
+        for keyword_id, line_nums in find_keyword_lines(
+            file_path, keywords, logger, automaton
+        ).items()
+    }
 
 
 def main():
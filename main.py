@@ -1,11 +1,15 @@
 from math import log
 import time
+import multiprocessing
+import multiprocessing.pool
 from file_utils import (
+    DEFAULT_WORKERS,
     create_test_files_and_folders,
     find_all_files,
+    init_pool_worker,
     Methods,
 )
-from thread_search import parallel_file_search_threading
+from thread_search import DEFAULT_THREADS, parallel_file_search_threading
 from process_search import parallel_file_search_multiprocessing
 import logging
 
@@ -25,13 +29,23 @@ logger.addHandler(file_handler)
 logger.setLevel(logging.DEBUG)
 
 def main():
+    # One process pool is shared by file generation and the multiprocessing search
+    num_processes = DEFAULT_WORKERS
+    with multiprocessing.Pool(num_processes, initializer=init_pool_worker) as pool:
+        run(pool, num_processes)
+
+
+def run(pool: multiprocessing.pool.Pool, num_processes: int):
     # Find test files
     print("Finding test files...")
     file_paths = find_all_files(logger=logger)
     if not file_paths:
         print("Files not found, generating...")
         file_paths = create_test_files_and_folders(
-            num_files=100000, parallel_method=Methods.MULTIPROCESSING, logger=logger
+            num_files=100000,
+            parallel_method=Methods.MULTIPROCESSING.value,
+            logger=logger,
+            pool=pool,
         )
         print(f"Created {len(file_paths)} files")
     else:
@@ -43,8 +57,12 @@ def main():
 
     print(f"\n{'=' * 80}")
     print("Search using threads:")
+    num_threads = DEFAULT_THREADS
+    print(f"Number of threads: {num_threads}")
     start_time = time.time()
-    threading_results = parallel_file_search_threading(file_paths, keywords, logger=logger)
+    threading_results = parallel_file_search_threading(
+        file_paths, keywords, num_threads=num_threads, logger=logger
+    )
     threading_time = time.time() - start_time
 
     print("\nSearch results (Threading):")
@@ -54,8 +72,11 @@ def main():
 
     print(f"\n{'=' * 80}")
     print("Search using processes:")
+    print(f"Number of processes: {num_processes}")
     start_time = time.time()
-    multiprocessing_results = parallel_file_search_multiprocessing(file_paths, keywords, logger=logger)
+    multiprocessing_results = parallel_file_search_multiprocessing(
+        file_paths, keywords, num_processes=num_processes, logger=logger, pool=pool
+    )
     multiprocessing_time = time.time() - start_time
 
     print("\nSearch results (Multiprocessing):")
@@ -65,4 +86,12 @@ def main():
 
 
 if __name__ == "__main__":
+    # Workers are forked from a server process that has already imported the
+    # modules (logging setup, vocabulary), instead of copying this process
+    # or importing everything again in every worker
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        multiprocessing.set_start_method("forkserver", force=True)
+        multiprocessing.set_forkserver_preload(
+            ["__main__", "file_utils", "thread_search", "process_search"]
+        )
     main()
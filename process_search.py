@@ -1,104 +1,122 @@
-import os
+import functools
 import multiprocessing
-from typing import List, Dict
-from file_utils import search_keywords_in_file
+import multiprocessing.pool
+from typing import List, Dict, Tuple
+import numpy as np
+from file_utils import (
+    DEFAULT_WORKERS,
+    find_keyword_lines,
+    get_keywords_automaton,
+    init_pool_worker,
+    prepare_keywords,
+    prepare_search_files,
+)
 
-def process_search(
-    files: List[str], keywords: List[str], result_queue: multiprocessing.Queue, logger=None
-) -> Dict[str, List[str]]:
+
+def _init_search_worker(keywords: Tuple[str, ...]) -> None:
+    """
+    Initialize a process of a search-only pool: besides the common worker
+    setup, build the keywords state up front, so the first task doesn't pay for it.
+    params:
+        keywords: Keywords to search for
+    """
+    init_pool_worker()
+    prepare_keywords(keywords)
+
+
+def _search_chunk(
+    task: Tuple[int, List[str]], keywords: Tuple[str, ...], logger=None
+) -> np.ndarray:
     """
-    Multiprocessing keyword search.
+    Pool task: keyword search in a chunk of files.
+    Hits of the whole chunk come back as one (keyword index, file index,
+    line number) int32 array, which is pickled as a single buffer; the
+    location strings are only formatted in the parent process.
     params:
-        files: List of files to process
+        task: Index of the first file of the chunk and the chunk's file paths
         keywords: Keywords to search for
-        result_queue: Queue for passing results
+        logger: Logger for logging messages
     return:
-        Result dictionary
+        Array of found hits with three columns
     """
-    process_results = {}
-    for file in files:
+    start, files = task
+    automaton = get_keywords_automaton(keywords)
+    hits = []
+    for file_idx, file in enumerate(files, start):
         try:
-            if logger:
-                logger.info(f"Processing file: {file}")
-            else:
-                print(f"Processing file: {file}")
-                
-            file_results = search_keywords_in_file(file, keywords, logger=logger)
-            for keyword, locations in file_results.items():
-                if keyword not in process_results:
-                    process_results[keyword] = []
-                process_results[keyword].extend(locations)
-                
-            if logger:
-                logger.info(f"Finished processing file: {file}")
-            else:
-                print(f"Finished processing file: {file}")
-                
+            file_results = find_keyword_lines(file, keywords, logger=logger, automaton=automaton)
+            for keyword_id, line_nums in file_results.items():
+                for line_num in line_nums:
+                    hits.extend((keyword_id, file_idx, line_num))
         except Exception as e:
             error_message = f"Error processing file {file}: {e}"
             if logger:
                 logger.error(error_message)
             else:
                 print(error_message)
-
-    result_queue.put(process_results)
+    return np.array(hits, dtype=np.int32).reshape(-1, 3)
 
 
 def parallel_file_search_multiprocessing(
-    file_paths: List[str], keywords: List[str], num_processes: int = None, logger=None
+    file_paths: List[str],
+    keywords: List[str],
+    num_processes: int = None,
+    logger=None,
+    pool: multiprocessing.pool.Pool = None,
 ) -> Dict[str, List[str]]:
     """
-    Parallel search using processes.
+    Parallel search using a pool of processes.
     params:
         file_paths: List of file paths
         keywords: Keywords to search for
-        num_processes: Number of processes (default is number of CPUs)
+        num_processes: Number of processes (default is number of available CPUs),
+            with a given pool it is only used to size the chunks of files
         logger: Logger for logging messages
+        pool: Process pool initialized with init_pool_worker to reuse
+            (optional, a new pool is started and closed otherwise)
     return:
         Result dictionary
     """
     if num_processes is None:
-        num_processes = os.cpu_count()
-        if logger:
-            logger.info(f"Number of processes: {num_processes}")
-        else:
-            print(f"Number of processes: {num_processes}")
+        # The search is CPU-bound: one process per available CPU
+        num_processes = DEFAULT_WORKERS
 
-    # Split files among processes
-    files_per_process = [file_paths[i::num_processes] for i in range(num_processes)]
+    if pool is None:
+        with multiprocessing.Pool(
+            num_processes, initializer=_init_search_worker, initargs=(tuple(keywords),)
+        ) as pool:
+            return parallel_file_search_multiprocessing(
+                file_paths, keywords, num_processes, logger=logger, pool=pool
+            )
 
-    result_queue = multiprocessing.Queue()
-    processes = []
+    if logger:
+        logger.info(f"Searching {len(file_paths)} files with {num_processes} processes")
 
-    for process_files in files_per_process:
-        if logger:
-            logger.info(f"Starting process for files: {process_files}")
-        else:
-            print(f"Starting process for files: {process_files}")
-        process = multiprocessing.Process(
-            target=process_search, args=(process_files, keywords, result_queue, logger)
-        )
-        process.start()
-        processes.append(process)
+    # Each non-empty file once, largest first, so the pool doesn't end on a long tail
+    file_paths = prepare_search_files(file_paths)
 
-    # Collect results
-    results = {}
-    for _ in processes:
-        process_result = result_queue.get()
-        for keyword, locations in process_result.items():
-            if keyword not in results:
-                results[keyword] = []
-            results[keyword].extend(locations)
+    # Files are handed out in chunks as workers become free, so fast
+    # workers don't sit idle while others finish a static shard.
+    # About four chunks per process keep IPC round trips few but balanced.
+    # The keywords travel once per chunk with the task, the automaton built
+    # from them is cached in every worker process and never pickled
+    chunksize = max(1, len(file_paths) // (num_processes * 4))
+    chunks = [
+        (start, file_paths[start:start + chunksize])
+        for start in range(0, len(file_paths), chunksize)
+    ]
+    search_task = functools.partial(_search_chunk, keywords=tuple(keywords), logger=logger)
+    locations = [[] for _ in keywords]
+    for hits in pool.imap_unordered(search_task, chunks):
+        for keyword_id, file_idx, line_num in hits.tolist():
+            locations[keyword_id].append(f"{file_paths[file_idx]}:line {line_num}")
 
-    # Wait for all processes to finish
-    for process in processes:
-        process.join()
-        if logger:
-            logger.info(f"Process {process.pid} finished")
-        else:
-            print(f"Process {process.pid} finished")
+    # One summary instead of messages for every file
+    if logger:
+        counts = {keyword: len(locs) for keyword, locs in zip(keywords, locations) if locs}
+        logger.info(f"Process pool search finished, found: {counts}")
 
-    return results
+    return {keyword: locs for keyword, locs in zip(keywords, locations) if locs}
 
 if __name__ == "__main__":
     pass
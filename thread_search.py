@@ -1,91 +1,86 @@
-import os
-import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict
-from file_utils import search_keywords_in_file
+import ahocorasick
+from file_utils import (
+    DEFAULT_WORKERS,
+    build_keywords_automaton,
+    prepare_search_files,
+    search_keywords_in_file,
+)
+
+# Reading many small files is I/O-bound: more threads than CPUs keep
+# more reads in flight
+DEFAULT_THREADS = min(32, 4 * DEFAULT_WORKERS)
+
 
 def thread_search(
-    files: List[str], keywords: List[str], result_dict: Dict, lock: threading.Lock, logger=None
+    file: str, keywords: List[str], automaton: ahocorasick.Automaton, logger=None
 ) -> Dict[str, List[str]]:
     """
-    Threaded keyword search.
+    Thread pool task: keyword search in a single file.
     params:
-        files: List of files to process
+        file: File to process
         keywords: Keywords to search for
-        result_dict: Shared result dictionary
-        lock: Lock for thread-safe updates
+        automaton: Keywords automaton shared by all threads
         logger: Logger for logging messages
     return:
         Result dictionary
     """
-    if logger:
-        logger.info(f"Thread started for files: {files}")
-    else:
-        print(f"Thread started for files: {files}")
-    thread_results = {}
-    for file in files:
-        try:
-            file_results = search_keywords_in_file(file, keywords, logger)
-            for keyword, locations in file_results.items():
-                if keyword not in thread_results:
-                    thread_results[keyword] = []
-                thread_results[keyword].extend(locations)
-        except Exception as e:
-            print(f"Error processing file {file}: {e}")
-
-    with lock:
-        for keyword, locations in thread_results.items():
-            if keyword not in result_dict:
-                result_dict[keyword] = []
-            result_dict[keyword].extend(locations)
+    try:
+        return search_keywords_in_file(file, keywords, logger, automaton)
+    except Exception as e:
+        error_message = f"Error processing file {file}: {e}"
+        if logger:
+            logger.error(error_message)
+        else:
+            print(error_message)
+        return {}
 
 
 def parallel_file_search_threading(
     file_paths: List[str], keywords: List[str], num_threads: int = None, logger=None
 ) -> Dict[str, List[str]]:
     """
-    Parallel search using threads.
+    Parallel search using a pool of threads.
     params:
         file_paths: List of file paths
         keywords: Keywords to search for
-        num_threads: Number of threads (default is number of CPUs)
+        num_threads: Number of threads (default is four per available CPU, at most 32)
         logger: Logger for logging messages
     return:
         Result dictionary
     """
     if num_threads is None:
-        num_threads = os.cpu_count()
-        if logger:
-            logger.info(f"Number of threads: {num_threads}")
-        else:
-            print(f"Number of threads: {num_threads}")
+        num_threads = DEFAULT_THREADS
+    if logger:
+        logger.info(f"Searching {len(file_paths)} files with {num_threads} threads")
 
-    # Split files among threads
-    files_per_thread = [file_paths[i::num_threads] for i in range(num_threads)]
+    # Each non-empty file once, largest first, so the threads don't end on a long tail
+    file_paths = prepare_search_files(file_paths)
 
-    result_dict = {}
-    lock = threading.Lock()
-    threads = []
+    # Build the keywords automaton once for all threads
+    automaton = build_keywords_automaton(keywords)
 
-    for thread_files in files_per_thread:
-        thread = threading.Thread(
-            target=thread_search, args=(thread_files, keywords, result_dict, lock, logger)
-        )
-        thread.start()
-        threads.append(thread)
-        if logger:
-            logger.info(f"Started thread for files: {thread_files}")
-        else:
-            print(f"Started thread for files: {thread_files}")
+    # One task per file: free threads pick up the next file, and the results
+    # are merged here in the main thread, so no lock or shared dict is needed
+    results = defaultdict(list)
+    with ThreadPoolExecutor(max_workers=num_threads) as executor:
+        for file_results in executor.map(
+            lambda file: thread_search(file, keywords, automaton, logger), file_paths
+        ):
+            for keyword, locations in file_results.items():
+                results[keyword].extend(locations)
 
-    # Wait for all threads to finish
-    for thread in threads:
-        thread.join()
-        if logger:
-            logger.info(f"Thread {thread.name} finished")
-        else:
-            print(f"Thread {thread.name} finished")
+    # Keywords in input order, like the process search, whatever order the hits came in
+    results = {keyword: results[keyword] for keyword in keywords if results.get(keyword)}
+
+    # One summary instead of messages for every file
+    if logger:
+        counts = {keyword: len(locations) for keyword, locations in results.items()}
+        logger.info(f"Thread pool search finished, found: {counts}")
 
-    return result_dict
+    return results
 
 if __name__ == "__main__":
-    pass
\ No newline at end of file
+    pass